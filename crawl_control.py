@@ -0,0 +1,63 @@
+import threading
+
+
+class CrawlControl:
+    """Stop/pause state for one crawl, shared by the GUI and the scraper threads.
+
+    An instance is passed to the scrapers as their stop_scraping callable:
+    calling it blocks while the crawl is paused and then returns True once a
+    stop was requested. Because pausing only blocks at those existing check
+    points, the crawl's frontier (recursion stack or queue) is kept as is and
+    resume carries on where it left off.
+
+    Stop callbacks registered with add_stop_callback() run when Stop is
+    pressed; a crawl's CrawlSession uses one to close the connections that are
+    still in flight, so a blocked request ends at once instead of at its timeout.
+    """
+
+    def __init__(self):
+        self._stopped = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+        self._stop_callbacks = []
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        return self.checkpoint()
+
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def add_stop_callback(self, callback):
+        """Calls callback() once when the crawl is stopped, or right away if it already is."""
+        with self._lock:
+            if not self.stopped:
+                self._stop_callbacks.append(callback)
+                return
+        callback()
+
+    def stop(self):
+        with self._lock:
+            self._stopped.set()
+            callbacks, self._stop_callbacks = self._stop_callbacks, []
+        # Wake a paused crawl so it can see the stop and unwind
+        self._running.set()
+        for callback in callbacks:
+            callback()
+
+    def pause(self):
+        if not self.stopped:
+            self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def checkpoint(self):
+        """Blocks while paused; returns True if the crawl should stop."""
+        self._running.wait()
+        return self.stopped
@@ -1,6 +1,6 @@
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urldefrag
+from urllib.parse import urljoin
 import csv
 import os
 import random
@@ -8,14 +8,13 @@ import threading
 import tkinter as tk
 from tkinter import messagebox
 
+from fetcher import fetch, CrawlSession, is_analyzed, claim_final_url, write_redirect_report, normalize_url
+
 
 def scrape_404_errors(base_url, output_folder, output_text, stop_scraping, update_stop_flag):
     """Scrapes website for 404 errors and exports to CSV."""
 
     def scrape_process():
-        def normalize_url(u: str) -> str:
-            return urldefrag(u)[0]
-
         random_number = random.randint(1000, 9999)
         filename = f'{base_url[8:]}-404-errors-{random_number}.csv'
         filepath = os.path.join(output_folder, filename)
@@ -25,6 +24,8 @@ def scrape_404_errors(base_url, output_folder, output_text, stop_scraping, updat
             csv_writer.writerow(['Post Name', 'Post URL', 'Not Found', 'Posts with Issues'])
 
             visited_urls = set()
+            # Cookies, connections and the alias -> final URL cache for this crawl
+            session = CrawlSession(base_url, control=stop_scraping)
             # 404-specific counters
             total_pages = 0
             article_counter, issues_counter = 1, 0
@@ -36,13 +37,16 @@ def scrape_404_errors(base_url, output_folder, output_text, stop_scraping, updat
                 if stop_scraping():   # check stop flag
                     return
 
-                if url in visited_urls:
+                if is_analyzed(url, visited_urls, session):
                     return
                 visited_urls.add(url)
-                total_pages += 1
 
                 try:
-                    response = requests.get(url)
+                    response = fetch(url, session=session, control=stop_scraping)
+                    url = claim_final_url(response, url, visited_urls)
+                    if url is None:
+                        return
+                    total_pages += 1
                     if response.status_code == 404:
                         csv_writer.writerow([f"Article {article_counter}", url, "404 Not Found", issues_counter])
                         issues_counter += 1
@@ -78,6 +82,9 @@ def scrape_404_errors(base_url, output_folder, output_text, stop_scraping, updat
             csv_writer.writerow(['', '', 'Summary - Total Pages Crawled:', total_pages])
             csv_writer.writerow(['', '', 'Summary - Pages with 404:', issues_counter])
             csv_writer.writerow(['', '', 'Summary - Pages OK:', max(total_pages - issues_counter, 0)])
+            csv_writer.writerow(['', '', 'Summary - Run Status:', 'Partial (stopped by user)' if stop_scraping() else 'Complete'])
+
+        write_redirect_report(session.redirects, output_folder, base_url, random_number, output_text)
 
         # ✅ Print only once at the end
         if stop_scraping():
@@ -89,3 +96,4 @@ def scrape_404_errors(base_url, output_folder, output_text, stop_scraping, updat
     # Run in background thread
     thread = threading.Thread(target=scrape_process, daemon=True)
     thread.start()
+    return thread
@@ -0,0 +1,519 @@
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib.parse import urljoin, urldefrag, urlparse, urlsplit, urlunsplit
+import csv
+import os
+import socket
+import threading
+import time
+import weakref
+
+# (connect, read) seconds; without a timeout a stalled host would never count as an error
+DEFAULT_TIMEOUT = (10, 30)
+
+# Responses that mean the server is struggling, as opposed to the page simply not existing
+OVERLOAD_STATUS_CODES = {429, 500, 502, 503, 504}
+
+REDIRECT_STATUS_CODES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 10
+
+# How often a request waiting for a throttle slot looks at CrawlControl.stopped
+CANCEL_POLL_INTERVAL = 0.1
+
+
+class RedirectLoopError(requests.exceptions.TooManyRedirects):
+    """A redirect chain came back to a URL it had already visited."""
+
+
+class CrawlCancelled(requests.exceptions.RequestException):
+    """The crawl was stopped while this request was waiting or in flight."""
+
+
+class _HostState:
+    """Per-host AIMD state. Only touched while holding AdaptiveThrottle._condition."""
+
+    def __init__(self, concurrency, delay, baseline_window):
+        self.concurrency = float(concurrency)
+        self.delay = delay
+        self.in_flight = 0
+        self.waiting = 0
+        self.next_slot = 0.0
+        self.ttfb_avg = None
+        self.ttfb_samples = deque(maxlen=baseline_window)
+        self.error_rate = 0.0
+        self.last_decrease = float('-inf')
+        self.requests = 0
+        self.errors = 0
+
+    @property
+    def ttfb_baseline(self):
+        """Median TTFB of the recent comparable responses, or None before the first one."""
+        if not self.ttfb_samples:
+            return None
+        return sorted(self.ttfb_samples)[len(self.ttfb_samples) // 2]
+
+
+class AdaptiveThrottle:
+    """AIMD rate controller keyed by host.
+
+    Every request first waits for a free slot (in-flight < concurrency) and for
+    the per-host delay since the previous request. When it finishes, its TTFB and
+    outcome update the host's state:
+
+    - healthy (no error and the short-term TTFB average not well above the
+      host's own baseline): concurrency grows by roughly one per window of
+      successful requests and the delay is multiplied by delay_recovery
+    - overloaded (Retry-After, the smoothed error rate above max_error_rate, or
+      the TTFB average more than slow_factor times the baseline and at least
+      min_slowdown seconds above it): concurrency is multiplied by
+      decrease_factor and the delay doubles
+
+    Errors are 429/5xx responses, timeouts and connection errors. A single one
+    (a broken page on a healthy host) only stops the ramp-up; a run of them
+    backs off.
+
+    Only responses that are comparable to each other feed the TTFB figures: the
+    caller passes ttfb for full GET 2xx pages and None for redirect hops, 404s
+    and HEAD requests, which are typically much cheaper. The baseline is the
+    median of the last baseline_window of those, so a host that is steadily
+    slow is not mistaken for one that is struggling, and a mix of cached and
+    dynamic pages does not make the dynamic ones look slow.
+
+    Only a request started after the previous decrease, i.e. one already sent
+    under the reduced limits and delay, can trigger another decrease, so
+    requests that were in flight together back off once.
+
+    Retry-After on 429/503 pushes the host's next slot out accordingly. All
+    values stay within the configured bounds.
+    """
+
+    def __init__(self, min_concurrency=1, max_concurrency=8, initial_concurrency=2,
+                 min_delay=0.0, max_delay=10.0, initial_delay=0.25, backoff_delay=0.25,
+                 delay_recovery=0.5, slow_factor=2.0, min_slowdown=0.2,
+                 decrease_factor=0.5, smoothing=0.2, baseline_window=50,
+                 error_smoothing=0.1, max_error_rate=0.15):
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.initial_concurrency = initial_concurrency
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.initial_delay = initial_delay
+        self.backoff_delay = backoff_delay
+        self.delay_recovery = delay_recovery
+        self.slow_factor = slow_factor
+        self.min_slowdown = min_slowdown
+        self.decrease_factor = decrease_factor
+        self.smoothing = smoothing
+        self.baseline_window = baseline_window
+        self.error_smoothing = error_smoothing
+        self.max_error_rate = max_error_rate
+        self._hosts = {}
+        self._condition = threading.Condition()
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(self.initial_concurrency, self.initial_delay, self.baseline_window)
+            self._hosts[host] = state
+        return state
+
+    def reset(self, host):
+        """Forgets what was learned about host, e.g. a backoff left over from a previous crawl.
+
+        Hosts with requests in flight or waiting for a slot are left alone so a
+        crawl running in another tab keeps its limits.
+        """
+        with self._condition:
+            state = self._hosts.get(host)
+            if state is not None and state.in_flight == 0 and state.waiting == 0:
+                del self._hosts[host]
+
+    def acquire(self, host, control=None):
+        """Blocks until a request to host may start and returns its start time for release().
+
+        Raises CrawlCancelled if control (a CrawlControl) is stopped while waiting.
+        """
+        with self._condition:
+            state = self._state(host)
+            # Counted as waiting so reset() cannot swap the state out from under this request
+            state.waiting += 1
+            try:
+                while True:
+                    if control is not None and control.stopped:
+                        raise CrawlCancelled(f"Crawl stopped before requesting {host}")
+                    now = time.monotonic()
+                    if state.in_flight < int(state.concurrency) and now >= state.next_slot:
+                        break
+                    wait = state.next_slot - now if state.in_flight < int(state.concurrency) else None
+                    if control is not None:
+                        wait = CANCEL_POLL_INTERVAL if wait is None else min(wait, CANCEL_POLL_INTERVAL)
+                    self._condition.wait(wait)
+            finally:
+                state.waiting -= 1
+            state.in_flight += 1
+            state.next_slot = now + state.delay
+            return now
+
+    def release(self, host, started, ttfb=None, error=False, retry_after=None, cancelled=False):
+        """Records the outcome of a request started with acquire() and adapts the host's limits.
+
+        ttfb should only be given for responses comparable with the host's
+        normal pages (see the class docstring). Cancelled requests only free
+        their slot; they say nothing about the host.
+        """
+        with self._condition:
+            state = self._state(host)
+            state.in_flight -= 1
+            if cancelled:
+                self._condition.notify_all()
+                return
+            state.requests += 1
+            now = time.monotonic()
+
+            if ttfb is not None:
+                state.ttfb_samples.append(ttfb)
+                if state.ttfb_avg is None:
+                    state.ttfb_avg = ttfb
+                else:
+                    state.ttfb_avg = (1 - self.smoothing) * state.ttfb_avg + self.smoothing * ttfb
+            state.error_rate = (1 - self.error_smoothing) * state.error_rate \
+                + self.error_smoothing * (1.0 if error else 0.0)
+            if error:
+                state.errors += 1
+
+            baseline = state.ttfb_baseline
+            slow = baseline is not None \
+                and state.ttfb_avg > baseline * self.slow_factor \
+                and state.ttfb_avg - baseline > self.min_slowdown
+            overloaded = retry_after is not None or state.error_rate > self.max_error_rate or slow
+            if overloaded:
+                if started >= state.last_decrease:
+                    state.concurrency = max(self.min_concurrency, state.concurrency * self.decrease_factor)
+                    state.delay = min(self.max_delay, max(state.delay * 2, self.backoff_delay))
+                    state.last_decrease = now
+            elif not error:
+                state.concurrency = min(self.max_concurrency, state.concurrency + 1.0 / state.concurrency)
+                state.delay *= self.delay_recovery
+                if state.delay < 0.01:
+                    state.delay = 0.0
+                state.delay = max(self.min_delay, state.delay)
+
+            if retry_after:
+                state.next_slot = max(state.next_slot, now + min(retry_after, self.max_delay))
+            self._condition.notify_all()
+
+    def stats(self, host):
+        """Returns a snapshot of the host's current limits and averages."""
+        with self._condition:
+            state = self._state(host)
+            return {
+                'concurrency': int(state.concurrency),
+                'delay': state.delay,
+                'ttfb_avg': state.ttfb_avg,
+                'ttfb_baseline': state.ttfb_baseline,
+                'error_rate': state.error_rate,
+                'requests': state.requests,
+                'errors': state.errors,
+            }
+
+
+class RedirectCache:
+    """Maps every URL seen in a redirect chain to the chain's final URL.
+
+    One cache is shared by all fetches of a crawl, so once any alias of a page
+    has been followed the crawler can tell that the others lead to the same
+    place without fetching them. Chains are kept for the redirect report.
+    """
+
+    def __init__(self):
+        self._final = {}
+        self.chains = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, url):
+        """Returns the known final URL for url, or url itself if it was never seen redirecting."""
+        with self._lock:
+            return self._final.get(normalize_url(url), url)
+
+    def record(self, hops, final_url, issue):
+        """Stores a chain of (url, status) pairs, source first and landing URL last.
+
+        final_url is None when the chain never settled (loops, too many redirects).
+        """
+        with self._lock:
+            source = hops[0][0]
+            self.chains[source] = (hops, final_url, issue)
+            if final_url is not None:
+                for hop_url, _ in hops:
+                    self._final[hop_url] = final_url
+
+    def write_csv(self, filepath):
+        """Exports one row per recorded chain plus summary rows. Returns the number of chains."""
+        with self._lock:
+            chains = list(self.chains.values())
+        issue_counts = {}
+        with open(filepath, 'w', newline='', encoding='utf-8') as csv_file:
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerow(['Source URL', 'Final URL', 'Hops', 'Status Codes', 'Chain', 'Issue'])
+            for hops, final_url, issue in chains:
+                issue_counts[issue] = issue_counts.get(issue, 0) + 1
+                csv_writer.writerow([
+                    hops[0][0], final_url or '', len(hops) - 1, ' > '.join(str(status) for _, status in hops if status),
+                    ' -> '.join(hop_url for hop_url, _ in hops), issue
+                ])
+            csv_writer.writerow(['', '', '', '', 'Summary - Redirecting URLs:', len(chains)])
+            for issue in ('Redirect', 'Redirect Chain', 'Redirect Loop', 'Too Many Redirects'):
+                csv_writer.writerow(['', '', '', '', f'Summary - {issue}:', issue_counts.get(issue, 0)])
+        return len(chains)
+
+
+class _AbortablePoolMixin:
+    """Keeps track of the connections a urllib3 pool has handed out so abort() can cut them."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._checked_out = weakref.WeakSet()
+        self._checked_out_lock = threading.Lock()
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+        with self._checked_out_lock:
+            self._checked_out.add(conn)
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            with self._checked_out_lock:
+                self._checked_out.discard(conn)
+        super()._put_conn(conn)
+
+    def abort(self):
+        """Shuts down the sockets of in-flight requests, which makes their blocked reads fail at once."""
+        with self._checked_out_lock:
+            connections = list(self._checked_out)
+        for conn in connections:
+            sock = getattr(conn, 'sock', None)
+            if sock is None:
+                continue
+            try:
+                # Plain socket shutdown, also for TLS sockets: SSLSocket.shutdown() would tear
+                # down the SSL object under the thread that is still reading from it
+                socket.socket.shutdown(sock, socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class _AbortableHTTPConnectionPool(_AbortablePoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _AbortableHTTPSConnectionPool(_AbortablePoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class _AbortableAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _AbortableHTTPConnectionPool,
+            'https': _AbortableHTTPSConnectionPool,
+        }
+
+    def abort(self):
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                pool.abort()
+
+
+class CrawlSession(requests.Session):
+    """requests.Session for one crawl.
+
+    Keeps cookies across redirect hops and pages (consent and age gates often
+    set a cookie and redirect back to the same URL), reuses connections, and
+    carries the crawl's RedirectCache.
+
+    Starting a session for base_url also resets the throttle's state for that
+    host, so a backoff from an earlier run does not slow down a new crawl.
+    Given the crawl's control (a CrawlControl), the session aborts its open
+    connections when the crawl is stopped.
+    """
+
+    def __init__(self, base_url=None, throttle=None, control=None):
+        super().__init__()
+        self.redirects = RedirectCache()
+        self.mount('https://', _AbortableAdapter())
+        self.mount('http://', _AbortableAdapter())
+        if base_url:
+            (default_throttle if throttle is None else throttle).reset(urlparse(base_url).netloc)
+        if control is not None:
+            control.add_stop_callback(self.abort)
+
+    def abort(self):
+        """Fails every request in flight on this session and closes its connection pools."""
+        for adapter in self.adapters.values():
+            adapter.abort()
+        self.close()
+
+
+def normalize_url(url):
+    """Drops the fragment and spells an empty path as "/", so https://host and https://host/ are one page."""
+    url = urldefrag(url)[0]
+    parts = urlsplit(url)
+    if parts.netloc and not parts.path:
+        url = urlunsplit(parts._replace(path='/'))
+    return url
+
+
+# Shared by every scraper so tabs crawling the same host at once are limited together
+default_throttle = AdaptiveThrottle()
+
+
+def is_analyzed(url, visited_urls, session):
+    """True if url, or the final URL it is known to redirect to, has already been visited."""
+    return url in visited_urls or session.redirects.resolve(url) in visited_urls
+
+
+def claim_final_url(response, url, visited_urls):
+    """Returns the URL a fetched page should be analyzed under, marking it visited.
+
+    Returns None when the request for url was redirected to a page that has
+    already been visited, so the caller can drop it as a duplicate.
+    """
+    final_url = normalize_url(response.url)
+    if final_url != url:
+        if final_url in visited_urls:
+            return None
+        visited_urls.add(final_url)
+    return final_url
+
+
+def write_redirect_report(redirects, output_folder, base_url, random_number, output_text):
+    """Writes <host>-redirects-<n>.csv next to the scraper's own export if any redirects were seen."""
+    if not redirects.chains:
+        return
+    redirects_path = os.path.join(output_folder, f"{base_url[8:]}-redirects-{random_number}.csv")
+    redirect_count = redirects.write_csv(redirects_path)
+    output_text.insert('end', f"\nRedirecting URLs found: {redirect_count}. Report saved to {redirects_path}\n")
+
+
+def _cookie_state(session):
+    return frozenset((c.domain, c.path, c.name, c.value) for c in session.cookies)
+
+
+def _retry_after_seconds(response):
+    value = response.headers.get('Retry-After', '')
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        # HTTP-date form is rare on small hosts; fall back to the normal backoff
+        return None
+
+
+def _throttled_request(session, method, url, throttle, timeout, control=None, **kwargs):
+    host = urlparse(url).netloc
+    ttfb, error, retry_after, cancelled = None, False, None, False
+
+    started = throttle.acquire(host, control)
+    try:
+        response = session.request(method, url, timeout=timeout, **kwargs)
+        # elapsed covers sending the request up to parsing the response headers. Only full
+        # pages count towards the host's TTFB; redirects, 404s and HEADs are much cheaper.
+        if method == 'GET' and 200 <= response.status_code < 300:
+            ttfb = response.elapsed.total_seconds()
+        if response.status_code in OVERLOAD_STATUS_CODES:
+            error = True
+            retry_after = _retry_after_seconds(response)
+            if retry_after is None and response.status_code == 429:
+                # An explicit "slow down" backs off at once, even without a usable Retry-After
+                retry_after = 0.0
+        return response
+    except CrawlCancelled:
+        cancelled = True
+        raise
+    except requests.exceptions.RequestException as e:
+        if control is not None and control.stopped:
+            # The session cut the connection because the crawl was stopped
+            cancelled = True
+            raise CrawlCancelled(f"Crawl stopped while fetching {url}") from e
+        if isinstance(e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+            error = True
+        raise
+    finally:
+        throttle.release(host, started, ttfb, error, retry_after, cancelled)
+
+
+def fetch(url, session=None, throttle=None, method='GET', timeout=DEFAULT_TIMEOUT, control=None,
+          track_redirects=True, **kwargs):
+    """Performs a request through the adaptive throttle and returns the requests.Response.
+
+    session is the crawl's CrawlSession; without one a throwaway session is
+    used so cookies still carry across the hops of this request.
+
+    Redirects are followed here, one throttled hop at a time, rather than by
+    requests. response.url is the final URL and response.history holds the
+    intermediate responses, as with requests. With track_redirects, every
+    chain is recorded in session.redirects and hops it already knows are skipped.
+
+    With a control (the crawl's CrawlControl), waiting for a throttle slot is
+    abandoned within CANCEL_POLL_INTERVAL of a stop. A request in flight ends as
+    soon as the CrawlSession created with that control aborts its connections.
+
+    Raises the same requests exceptions as requests.request(), plus
+    RedirectLoopError (a TooManyRedirects) when a chain loops and CrawlCancelled
+    when the crawl is stopped, so callers keep their existing error handling.
+    """
+    throttle = default_throttle if throttle is None else throttle
+    session = CrawlSession() if session is None else session
+    redirect_cache = session.redirects if track_redirects else None
+    if not kwargs.pop('allow_redirects', True):
+        return _throttled_request(session, method, url, throttle, timeout, control, allow_redirects=False, **kwargs)
+
+    url = normalize_url(url)
+    if redirect_cache is not None:
+        url = redirect_cache.resolve(url)
+
+    hops = []
+    history = []
+    # A URL only counts as revisited if the cookies are unchanged too: "set cookie,
+    # redirect to self" is a normal gate, not a loop
+    seen = set()
+    while True:
+        seen.add((url, _cookie_state(session)))
+        response = _throttled_request(session, method, url, throttle, timeout, control, allow_redirects=False,
+                                      **kwargs)
+        location = response.headers.get('Location')
+        if response.status_code not in REDIRECT_STATUS_CODES or not location:
+            break
+
+        hops.append((url, response.status_code))
+        history.append(response)
+        next_url = normalize_url(urljoin(url, location))
+        if redirect_cache is not None:
+            next_url = redirect_cache.resolve(next_url)
+
+        if (next_url, _cookie_state(session)) in seen:
+            if redirect_cache is not None:
+                redirect_cache.record(hops + [(next_url, '')], None, 'Redirect Loop')
+            raise RedirectLoopError(f"Redirect loop: {' -> '.join(u for u, _ in hops)} -> {next_url}",
+                                    response=response)
+        if len(hops) >= MAX_REDIRECTS:
+            if redirect_cache is not None:
+                redirect_cache.record(hops, None, 'Too Many Redirects')
+            raise requests.exceptions.TooManyRedirects(f"Exceeded {MAX_REDIRECTS} redirects from {hops[0][0]}",
+                                                       response=response)
+        if method == 'POST' and response.status_code in (301, 302, 303):
+            method = 'GET'
+        url = next_url
+
+    # Report the URL in normalize_url() form, the same one callers use for their keys
+    response.url = url
+    if hops:
+        response.history = history
+        if redirect_cache is not None:
+            redirect_cache.record(hops + [(url, response.status_code)], url,
+                                  'Redirect Chain' if len(hops) > 1 else 'Redirect')
+    return response
@@ -1,6 +1,6 @@
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse, urldefrag
+from urllib.parse import urljoin, urlparse
 import csv
 import os
 import random
@@ -8,6 +8,8 @@ import threading
 import tkinter as tk
 from tkinter import messagebox
 
+from fetcher import fetch, CrawlSession, is_analyzed, claim_final_url, write_redirect_report, normalize_url
+
 
 def scrape_images(base_url, output_folder, output_text, stop_scraping, update_stop_flag):
     """Scrapes the website for <img> tags and exports their data to CSV.
@@ -34,6 +36,8 @@ def scrape_images(base_url, output_folder, output_text, stop_scraping, update_st
             ])
 
             visited_urls = set()
+            # Cookies, connections and the alias -> final URL cache for this crawl
+            session = CrawlSession(base_url, control=stop_scraping)
             total_issues_counter = 0
             # Image-specific counters
             total_pages = 0               # pages crawled
@@ -62,7 +66,8 @@ def scrape_images(base_url, output_folder, output_text, stop_scraping, update_st
                     return True
                 # Some CDNs serve images without extensions. Try HEAD to verify Content-Type.
                 try:
-                    head = requests.head(url, allow_redirects=True, timeout=5)
+                    head = fetch(url, session=session, method='HEAD', allow_redirects=True, timeout=5,
+                                 control=stop_scraping, track_redirects=False)
                     content_type = head.headers.get('Content-Type', '')
                     return content_type.lower().startswith('image/')
                 except requests.RequestException:
@@ -99,24 +104,23 @@ def scrape_images(base_url, output_folder, output_text, stop_scraping, update_st
 
                 return False
 
-            def normalize_url(u: str) -> str:
-                return urldefrag(u)[0]
-
             def scrape_page(url):
-                nonlocal total_issues_counter
+                nonlocal total_issues_counter, total_pages, total_images, images_missing_alt, images_with_alt
 
                 if stop_scraping():
                     return
                 url = normalize_url(url)
-                if url in visited_urls:
+                if is_analyzed(url, visited_urls, session):
                     return
                 visited_urls.add(url)
 
-                # Count this page
-                total_pages += 1
-
                 try:
-                    response = requests.get(url)
+                    response = fetch(url, session=session, control=stop_scraping)
+                    url = claim_final_url(response, url, visited_urls)
+                    if url is None:
+                        return
+                    # Count this page
+                    total_pages += 1
                     response.raise_for_status()
                 except requests.exceptions.RequestException as e:
                     output_text.insert(tk.END, f"Failed to fetch {url}: {e}\n")
@@ -189,6 +193,9 @@ def scrape_images(base_url, output_folder, output_text, stop_scraping, update_st
             csv_writer.writerow(['', '', '', '', 'Summary - Total Images Recorded:', total_images, ''])
             csv_writer.writerow(['', '', '', '', 'Summary - Images Missing Alt:', images_missing_alt, ''])
             csv_writer.writerow(['', '', '', '', 'Summary - Images With Alt:', images_with_alt, ''])
+            csv_writer.writerow(['', '', '', '', 'Summary - Run Status:', 'Partial (stopped by user)' if stop_scraping() else 'Complete', ''])
+
+        write_redirect_report(session.redirects, output_folder, base_url, random_number, output_text)
 
         if stop_scraping():
             output_text.insert(tk.END, "\nScraping stopped by user.\n")
@@ -198,3 +205,4 @@ def scrape_images(base_url, output_folder, output_text, stop_scraping, update_st
 
     thread = threading.Thread(target=scrape_process, daemon=True)
     thread.start()
+    return thread
@@ -0,0 +1,257 @@
+from array import array
+from contextlib import contextmanager
+import csv
+import os
+from xml.sax.saxutils import escape
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import shortest_path
+
+
+# Edges are turned into Python ints this many at a time when exporting
+EDGE_CHUNK_SIZE = 65536
+
+
+@contextmanager
+def _open_for_replace(path, newline=None):
+    """Writes to path + '.part' and renames it over path only once writing has finished.
+
+    An export cut short (e.g. the app quitting mid-write) leaves the .part file
+    behind instead of a truncated file that looks complete.
+    """
+    part_path = path + '.part'
+    with open(part_path, 'w', newline=newline, encoding='utf-8') as f:
+        yield f
+    os.replace(part_path, path)
+
+
+def _edge_chunks(matrix, chunk_size=EDGE_CHUNK_SIZE):
+    """Yields the matrix's (source ids, target ids) as lists of at most chunk_size edges each."""
+    edges = matrix.tocoo()
+    for start in range(0, edges.nnz, chunk_size):
+        stop = start + chunk_size
+        yield edges.row[start:stop].tolist(), edges.col[start:stop].tolist()
+
+
+class LinkGraph:
+    """Internal link graph stored as a compact edge list of integer URL ids.
+
+    Every URL is interned once into ``urls``/``url_ids``; edges are two parallel
+    ``array('I')`` columns (8 bytes per edge), so millions of links fit in a few
+    tens of MB. Metrics are computed on a SciPy sparse matrix built from those
+    buffers without copying them into Python objects.
+
+    Redirecting URLs are recorded with add_alias() rather than as links. When
+    the matrix is built every alias is collapsed onto its final URL, so a
+    redirect adds neither a click of depth nor a PageRank hop, and alias nodes
+    are left out of the metrics and exports.
+    """
+
+    def __init__(self):
+        self.urls = []
+        self.url_ids = {}
+        self.sources = array('I')
+        self.targets = array('I')
+        self.aliases = {}
+
+    def __len__(self):
+        return len(self.urls)
+
+    def url_id(self, url: str) -> int:
+        """Returns the integer id for url, assigning a new one on first sight."""
+        node_id = self.url_ids.get(url)
+        if node_id is None:
+            node_id = len(self.urls)
+            self.url_ids[url] = node_id
+            self.urls.append(url)
+        return node_id
+
+    def add_edge(self, source_url: str, target_url: str):
+        source = self.url_id(source_url)
+        target = self.url_id(target_url)
+        if source != target:
+            self.sources.append(source)
+            self.targets.append(target)
+
+    def add_alias(self, alias_url: str, final_url: str):
+        """Records that alias_url redirects to final_url."""
+        alias = self.url_id(alias_url)
+        final = self.url_id(final_url)
+        if alias != final:
+            self.aliases[alias] = final
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.sources)
+
+    def canonical_ids(self) -> np.ndarray:
+        """Maps every node id to itself, or to its final URL's id for redirect aliases."""
+        ids = np.arange(len(self.urls), dtype=np.int64)
+        if self.aliases:
+            alias_ids = np.fromiter(self.aliases.keys(), dtype=np.int64, count=len(self.aliases))
+            final_ids = np.fromiter(self.aliases.values(), dtype=np.int64, count=len(self.aliases))
+            ids[alias_ids] = final_ids
+        return ids
+
+    def adjacency(self) -> sparse.csr_matrix:
+        """Returns the n x n adjacency matrix (row = source page) with aliases collapsed onto
+        their final URLs and duplicate links merged. Alias rows and columns stay empty."""
+        n = len(self.urls)
+        canonical = self.canonical_ids()
+        rows = np.frombuffer(self.sources, dtype=np.uint32) if self.sources else np.empty(0, dtype=np.uint32)
+        cols = np.frombuffer(self.targets, dtype=np.uint32) if self.targets else np.empty(0, dtype=np.uint32)
+        rows, cols = canonical[rows], canonical[cols]
+        keep = rows != cols
+        rows, cols = rows[keep], cols[keep]
+        data = np.ones(len(rows), dtype=np.float32)
+        matrix = sparse.csr_matrix((data, (rows, cols)), shape=(n, n))
+        matrix.sum_duplicates()
+        matrix.data[:] = 1.0
+        return matrix
+
+    def click_depth(self, root_url: str, matrix=None) -> np.ndarray:
+        """Returns the minimum number of clicks from root_url to every page (-1 if unreachable)."""
+        matrix = self.adjacency() if matrix is None else matrix
+        if root_url not in self.url_ids:
+            return np.full(len(self.urls), -1, dtype=np.int32)
+        root = self.aliases.get(self.url_ids[root_url], self.url_ids[root_url])
+        distances = shortest_path(matrix, directed=True, unweighted=True, indices=root)
+        depth = np.full(len(self.urls), -1, dtype=np.int32)
+        reachable = np.isfinite(distances)
+        depth[reachable] = distances[reachable].astype(np.int32)
+        return depth
+
+    def inlink_counts(self, matrix=None) -> np.ndarray:
+        """Returns the number of distinct internal pages linking to every page."""
+        matrix = self.adjacency() if matrix is None else matrix
+        return matrix.getnnz(axis=0)
+
+    def outlink_counts(self, matrix=None) -> np.ndarray:
+        matrix = self.adjacency() if matrix is None else matrix
+        return matrix.getnnz(axis=1)
+
+    def pagerank(self, matrix=None, damping=0.85, tol=1e-8, max_iter=100) -> np.ndarray:
+        """Internal PageRank by sparse power iteration.
+
+        Rank held by pages without outlinks (dangling pages, including discovered
+        but uncrawled URLs) is spread uniformly over all pages on each step.
+        Redirect aliases are not pages and keep a rank of 0.
+        """
+        matrix = self.adjacency() if matrix is None else matrix
+        n = matrix.shape[0]
+        if n == 0:
+            return np.empty(0, dtype=np.float64)
+
+        pages = np.ones(n, dtype=bool)
+        if self.aliases:
+            pages[list(self.aliases)] = False
+        page_count = int(pages.sum())
+        out_degree = np.asarray(matrix.getnnz(axis=1), dtype=np.float64)
+        dangling = (out_degree == 0) & pages
+        inv_out_degree = np.divide(1.0, out_degree, out=np.zeros(n), where=out_degree > 0)
+        transposed = matrix.T.tocsr()
+
+        rank = np.where(pages, 1.0 / page_count, 0.0)
+        for _ in range(max_iter):
+            new_rank = damping * (transposed @ (rank * inv_out_degree))
+            new_rank[pages] += (damping * rank[dangling].sum() + (1.0 - damping)) / page_count
+            converged = np.abs(new_rank - rank).sum() < tol
+            rank = new_rank
+            if converged:
+                break
+        return rank
+
+    def orphan_candidates(self, sitemap_urls, inlinks=None) -> np.ndarray:
+        """Returns a boolean mask of sitemap URLs that no crawled page links to.
+
+        Sitemap URLs the crawl never discovered are added to the graph so they
+        show up in exports as unreachable pages.
+        """
+        sitemap_ids = [self.aliases.get(self.url_id(u), self.url_id(u)) for u in sitemap_urls]
+        inlinks = self.inlink_counts() if inlinks is None else inlinks
+        if len(inlinks) < len(self.urls):
+            inlinks = np.concatenate([inlinks, np.zeros(len(self.urls) - len(inlinks), dtype=inlinks.dtype)])
+        mask = np.zeros(len(self.urls), dtype=bool)
+        if sitemap_ids:
+            ids = np.asarray(sitemap_ids, dtype=np.int64)
+            mask[ids] = inlinks[ids] == 0
+        return mask
+
+    def metrics(self, root_url: str, sitemap_urls=None) -> dict:
+        """Computes all node metrics in one go, sharing a single adjacency matrix."""
+        if sitemap_urls:
+            # Intern sitemap URLs first so every array below has the same length
+            for u in sitemap_urls:
+                self.url_id(u)
+        matrix = self.adjacency()
+        inlinks = self.inlink_counts(matrix)
+        return {
+            'matrix': matrix,
+            'depth': self.click_depth(root_url, matrix),
+            'inlinks': inlinks,
+            'outlinks': self.outlink_counts(matrix),
+            'pagerank': self.pagerank(matrix),
+            'orphan': self.orphan_candidates(sitemap_urls or [], inlinks),
+        }
+
+    def export_csv(self, nodes_path: str, edges_path: str, metrics: dict, run_status: str = 'Complete'):
+        """Writes one row per page to nodes_path and one row per link (as ids) to edges_path.
+
+        Both files end with a Run Status row so a partial crawl's export is marked as such.
+        """
+        with _open_for_replace(nodes_path, newline='') as nodes_file:
+            writer = csv.writer(nodes_file)
+            writer.writerow(['ID', 'URL', 'Crawl Depth', 'Inlinks', 'Outlinks', 'PageRank', 'Orphan Candidate'])
+            for node_id, url in enumerate(self.urls):
+                if node_id in self.aliases:
+                    continue
+                writer.writerow([
+                    node_id, url, int(metrics['depth'][node_id]), int(metrics['inlinks'][node_id]),
+                    int(metrics['outlinks'][node_id]), f"{metrics['pagerank'][node_id]:.8f}",
+                    'Yes' if metrics['orphan'][node_id] else 'No'
+                ])
+            writer.writerow(['', '', '', '', '', 'Summary - Run Status:', run_status])
+
+        with _open_for_replace(edges_path, newline='') as edges_file:
+            writer = csv.writer(edges_file)
+            writer.writerow(['Source ID', 'Target ID'])
+            for sources, targets in _edge_chunks(metrics['matrix']):
+                writer.writerows(zip(sources, targets))
+            writer.writerow(['Summary - Run Status:', run_status])
+
+    def export_graphml(self, path: str, metrics: dict, run_status: str = 'Complete'):
+        """Streams the graph to GraphML so large crawls never build an in-memory XML tree.
+
+        run_status is stored as graph-level data so a partial crawl's export is marked as such.
+        """
+        with _open_for_replace(path) as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            f.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+            f.write('  <key id="url" for="node" attr.name="url" attr.type="string"/>\n')
+            f.write('  <key id="depth" for="node" attr.name="crawl_depth" attr.type="int"/>\n')
+            f.write('  <key id="inlinks" for="node" attr.name="inlinks" attr.type="int"/>\n')
+            f.write('  <key id="outlinks" for="node" attr.name="outlinks" attr.type="int"/>\n')
+            f.write('  <key id="pagerank" for="node" attr.name="pagerank" attr.type="double"/>\n')
+            f.write('  <key id="orphan" for="node" attr.name="orphan_candidate" attr.type="boolean"/>\n')
+            f.write('  <key id="run_status" for="graph" attr.name="run_status" attr.type="string"/>\n')
+            f.write('  <graph id="internal-links" edgedefault="directed">\n')
+            f.write(f'    <data key="run_status">{escape(run_status)}</data>\n')
+            for node_id, url in enumerate(self.urls):
+                if node_id in self.aliases:
+                    continue
+                f.write(
+                    f'    <node id="n{node_id}">'
+                    f'<data key="url">{escape(url)}</data>'
+                    f'<data key="depth">{int(metrics["depth"][node_id])}</data>'
+                    f'<data key="inlinks">{int(metrics["inlinks"][node_id])}</data>'
+                    f'<data key="outlinks">{int(metrics["outlinks"][node_id])}</data>'
+                    f'<data key="pagerank">{metrics["pagerank"][node_id]:.8f}</data>'
+                    f'<data key="orphan">{"true" if metrics["orphan"][node_id] else "false"}</data>'
+                    '</node>\n'
+                )
+            for sources, targets in _edge_chunks(metrics['matrix']):
+                f.write(''.join(f'    <edge source="n{source}" target="n{target}"/>\n'
+                                for source, target in zip(sources, targets)))
+            f.write('  </graph>\n')
+            f.write('</graphml>\n')
@@ -0,0 +1,192 @@
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+from urllib.parse import urljoin, urlparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import os
+import random
+import threading
+import tkinter as tk
+from tkinter import messagebox
+import xml.etree.ElementTree as ET
+
+from fetcher import fetch, default_throttle, CrawlSession, write_redirect_report, normalize_url
+from link_graph import LinkGraph
+
+# Only <a> tags are needed to build the graph; skipping the rest keeps parsing cheap on big pages
+LINKS_ONLY = SoupStrainer('a', href=True)
+
+
+def fetch_sitemap_urls(sitemap_url, session, stop_scraping, seen=None):
+    """Returns every <loc> URL from a sitemap, following nested sitemap indexes."""
+    seen = set() if seen is None else seen
+    if sitemap_url in seen or stop_scraping():
+        return []
+    seen.add(sitemap_url)
+
+    response = fetch(sitemap_url, session=session, control=stop_scraping, track_redirects=False)
+    response.raise_for_status()
+    root = ET.fromstring(response.content)
+
+    urls = []
+    is_index = root.tag.endswith('sitemapindex')
+    for element in root.iter():
+        if element.tag.endswith('loc') and element.text:
+            loc = element.text.strip()
+            if is_index:
+                urls.extend(fetch_sitemap_urls(loc, session, stop_scraping, seen))
+            else:
+                urls.append(normalize_url(loc))
+    return urls
+
+
+def scrape_link_graph(base_url, output_folder, output_text, stop_scraping, update_stop_flag,
+                      sitemap_url='', export_format='csv'):
+    """Crawls the website, records its internal link graph and exports graph metrics.
+
+    Per page the export contains:
+    - URL
+    - Crawl Depth (clicks from the base URL, -1 if unreachable)
+    - Inlinks / Outlinks (distinct internal pages)
+    - PageRank (internal only)
+    - Orphan Candidate (in the sitemap but not linked from any crawled page)
+
+    export_format is 'csv' (nodes + edges files) or 'graphml'.
+    """
+
+    def scrape_process():
+        random_number = random.randint(1000, 9999)
+        root_url = normalize_url(base_url)
+        base_root = root_url
+        graph = LinkGraph()
+        # Indexed by URL id: 1 once the URL has been queued, so the frontier never holds duplicates
+        queued = bytearray()
+        # Iterative breadth-first crawl: large sites are too deep for the recursive crawl used elsewhere.
+        # Pages are fetched concurrently, so the export order is only roughly breadth-first.
+        frontier = deque()
+        total_pages = 0
+        throttle = default_throttle
+        # Cookies, connections and the alias -> final URL cache for this crawl
+        session = CrawlSession(base_url, throttle, stop_scraping)
+        redirects = session.redirects
+
+        def mark_queued(url):
+            """Returns True the first time url is seen, False afterwards."""
+            node_id = graph.url_id(url)
+            if node_id >= len(queued):
+                queued.extend(b'\x00' * (node_id + 1 - len(queued)))
+            if queued[node_id]:
+                return False
+            queued[node_id] = 1
+            return True
+
+        def enqueue(url):
+            if mark_queued(url):
+                frontier.append(url)
+
+        def fetch_links(url):
+            """Runs on a worker thread: fetches url and returns its final URL and in-domain link targets."""
+            response = fetch(url, session=session, throttle=throttle, control=stop_scraping)
+            response.raise_for_status()
+            final_url = normalize_url(response.url)
+            page_targets = set()
+            if 'html' in response.headers.get('Content-Type', '').lower():
+                soup = BeautifulSoup(response.text, 'html.parser', parse_only=LINKS_ONLY)
+                for link in soup.find_all('a', href=True):
+                    # Relative links resolve against where the page actually lives, not the pre-redirect URL
+                    full_url = normalize_url(urljoin(final_url, link['href']))
+                    if base_root in full_url and full_url != final_url:
+                        page_targets.add(full_url)
+            return final_url, page_targets
+
+        enqueue(root_url)
+        host = urlparse(root_url).netloc
+        pending = {}
+        # The pool is sized to the throttle's upper bound; the throttle decides how many actually run
+        with ThreadPoolExecutor(max_workers=throttle.max_concurrency) as pool:
+            while frontier or pending:
+                if stop_scraping():
+                    for future in pending:
+                        future.cancel()
+                    break
+                while frontier and len(pending) < throttle.max_concurrency:
+                    url = frontier.popleft()
+                    final_url = redirects.resolve(url)
+                    if final_url != url:
+                        # Known alias: collapse it onto its final URL instead of fetching it again
+                        graph.add_alias(url, final_url)
+                        enqueue(final_url)
+                        continue
+                    pending[pool.submit(fetch_links, url)] = url
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = pending.pop(future)
+                    try:
+                        final_url, page_targets = future.result()
+                    except requests.exceptions.RequestException as e:
+                        output_text.insert(tk.END, f"Failed to fetch {url}: {e}\n")
+                        output_text.see('end')
+                        continue
+
+                    if final_url != url:
+                        graph.add_alias(url, final_url)
+                        if not mark_queued(final_url):
+                            # The page itself or another alias of it is already queued or analyzed
+                            continue
+                        url = final_url
+
+                    total_pages += 1
+                    output_text.insert(tk.END, f"Scraping URL: {url}\n")
+                    output_text.see('end')
+                    # Graph updates stay on this thread so LinkGraph needs no locking
+                    for target in page_targets:
+                        graph.add_edge(url, target)
+                        enqueue(target)
+
+        stats = throttle.stats(host)
+        output_text.insert(tk.END, f"Throttle - Concurrency: {stats['concurrency']}, Delay: {stats['delay']:.2f}s, "
+                                   f"Errors: {stats['errors']}/{stats['requests']}\n")
+
+        sitemap_urls = []
+        if sitemap_url and not stop_scraping():
+            try:
+                # Sitemaps often list an alias spelling (http, missing slash) of a crawled page
+                sitemap_urls = [redirects.resolve(u) for u in fetch_sitemap_urls(sitemap_url, session, stop_scraping)]
+            except (requests.exceptions.RequestException, ET.ParseError) as e:
+                output_text.insert(tk.END, f"Failed to read sitemap {sitemap_url}: {e}\n")
+                output_text.see('end')
+
+        # Decided once so the exports and the summary below agree even if Stop comes during the export
+        run_status = 'Partial (stopped by user)' if stop_scraping() else 'Complete'
+        output_text.insert(tk.END, f"\nComputing metrics for {len(graph)} URLs and {graph.edge_count} links...\n")
+        output_text.see('end')
+        metrics = graph.metrics(root_url, sitemap_urls)
+
+        if export_format == 'graphml':
+            filepath = os.path.join(output_folder, f"{base_url[8:]}-link-graph-{random_number}.graphml")
+            graph.export_graphml(filepath, metrics, run_status)
+        else:
+            filepath = os.path.join(output_folder, f"{base_url[8:]}-link-graph-nodes-{random_number}.csv")
+            edges_path = os.path.join(output_folder, f"{base_url[8:]}-link-graph-edges-{random_number}.csv")
+            graph.export_csv(filepath, edges_path, metrics, run_status)
+
+        write_redirect_report(redirects, output_folder, base_url, random_number, output_text)
+
+        output_text.insert(tk.END, f"Summary - Run Status: {run_status}\n")
+        output_text.insert(tk.END, f"Summary - Total Pages Crawled: {total_pages}\n")
+        output_text.insert(tk.END, f"Summary - Internal Links: {metrics['matrix'].nnz}\n")
+        output_text.insert(tk.END, f"Summary - Max Crawl Depth: {int(metrics['depth'].max()) if len(graph) else 0}\n")
+        if sitemap_url:
+            output_text.insert(tk.END, f"Summary - Orphan Candidates: {int(metrics['orphan'].sum())}\n")
+
+        if run_status != 'Complete':
+            output_text.insert(tk.END, f"\nScraping stopped by user. Partial graph saved to {filepath}\n")
+        else:
+            output_text.insert(tk.END, f"\nLink graph complete. Results saved to {filepath}\n")
+            if not stop_scraping():
+                messagebox.showinfo("Success", f"Link graph complete! Results saved to {filepath}")
+
+    thread = threading.Thread(target=scrape_process, daemon=True)
+    thread.start()
+    return thread
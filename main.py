@@ -2,17 +2,27 @@ import tkinter as tk
 from tkinter import messagebox, scrolledtext, filedialog
 from tkinter import ttk
 import os
+import time
 from meta_scraper import scrape_meta_descriptions
 from error_scraper import scrape_404_errors
 from image_scraper import scrape_images
 from security_scraper import scrape_security
+from onpage_scraper import scrape_onpage
+from link_graph_scraper import scrape_link_graph
+from crawl_control import CrawlControl
+
+# Seconds Quit waits for running crawls to flush their CSVs before closing anyway
+SHUTDOWN_DEADLINE = 5
 
 tab_state = {
-    'meta': {'stop': False, 'folder': ''},
-    'errors': {'stop': False, 'folder': ''},
-    'images': {'stop': False, 'folder': ''},
-    'security': {'stop': False, 'folder': ''},
+    'meta': {'control': CrawlControl(), 'thread': None, 'folder': ''},
+    'errors': {'control': CrawlControl(), 'thread': None, 'folder': ''},
+    'images': {'control': CrawlControl(), 'thread': None, 'folder': ''},
+    'security': {'control': CrawlControl(), 'thread': None, 'folder': ''},
+    'onpage': {'control': CrawlControl(), 'thread': None, 'folder': ''},
+    'links': {'control': CrawlControl(), 'thread': None, 'folder': ''},
 }
+pause_buttons = {}
 
 
 def ensure_https(url):
@@ -29,11 +39,24 @@ def select_folder_for(tab_key, label_widget):
 
 
 def make_stop_functions(tab_key):
-    def stop_scraping():
-        return tab_state[tab_key]['stop']
-    def update_stop_flag():
-        tab_state[tab_key]['stop'] = True
-    return stop_scraping, update_stop_flag
+    # The CrawlControl is itself the stop_scraping callable: it blocks while paused.
+    # Stop any crawl still running on this tab so it does not outlive its Stop button.
+    tab_state[tab_key]['control'].stop()
+    control = CrawlControl()
+    tab_state[tab_key]['control'] = control
+    if tab_key in pause_buttons:
+        pause_buttons[tab_key].config(text="Pause")
+    return control, control.stop
+
+
+def toggle_pause(tab_key):
+    control = tab_state[tab_key]['control']
+    if control.paused:
+        control.resume()
+        pause_buttons[tab_key].config(text="Pause")
+    elif not control.stopped:
+        control.pause()
+        pause_buttons[tab_key].config(text="Resume")
 
 
 def run_meta_scraper():
@@ -43,11 +66,10 @@ def run_meta_scraper():
     if not url or not folder:
         messagebox.showerror("Error", "Enter URL and select export folder first.")
         return
-    # Reset stop flag for this run and wire stop functions
-    tab_state['meta']['stop'] = False
+    # Fresh stop/pause control for this run
     stop_fn, update_stop_fn = make_stop_functions('meta')
     meta_output_text.delete(1.0, tk.END)
-    scrape_meta_descriptions(url, folder, meta_output_text, stop_fn, update_stop_fn)
+    tab_state['meta']['thread'] = scrape_meta_descriptions(url, folder, meta_output_text, stop_fn, update_stop_fn)
 
 
 def run_error_scraper():
@@ -57,10 +79,9 @@ def run_error_scraper():
     if not url or not folder:
         messagebox.showerror("Error", "Enter URL and select export folder first.")
         return
-    tab_state['errors']['stop'] = False
     stop_fn, update_stop_fn = make_stop_functions('errors')
     errors_output_text.delete(1.0, tk.END)
-    scrape_404_errors(url, folder, errors_output_text, stop_fn, update_stop_fn)
+    tab_state['errors']['thread'] = scrape_404_errors(url, folder, errors_output_text, stop_fn, update_stop_fn)
 
 
 def run_image_scraper():
@@ -70,10 +91,9 @@ def run_image_scraper():
     if not url or not folder:
         messagebox.showerror("Error", "Enter URL and select export folder first.")
         return
-    tab_state['images']['stop'] = False
     stop_fn, update_stop_fn = make_stop_functions('images')
     images_output_text.delete(1.0, tk.END)
-    scrape_images(url, folder, images_output_text, stop_fn, update_stop_fn)
+    tab_state['images']['thread'] = scrape_images(url, folder, images_output_text, stop_fn, update_stop_fn)
 
 
 def run_security_scraper():
@@ -83,15 +103,60 @@ def run_security_scraper():
     if not url or not folder:
         messagebox.showerror("Error", "Enter URL and select export folder first.")
         return
-    tab_state['security']['stop'] = False
     stop_fn, update_stop_fn = make_stop_functions('security')
     security_output_text.delete(1.0, tk.END)
-    scrape_security(url, folder, security_output_text, stop_fn, update_stop_fn)
+    tab_state['security']['thread'] = scrape_security(url, folder, security_output_text, stop_fn, update_stop_fn)
+
+
+def run_onpage_scraper():
+    url = onpage_url_entry.get().strip().rstrip("/")
+    url = ensure_https(url)
+    folder = tab_state['onpage']['folder']
+    if not url or not folder:
+        messagebox.showerror("Error", "Enter URL and select export folder first.")
+        return
+    stop_fn, update_stop_fn = make_stop_functions('onpage')
+    onpage_output_text.delete(1.0, tk.END)
+    tab_state['onpage']['thread'] = scrape_onpage(url, folder, onpage_output_text, stop_fn, update_stop_fn)
+
+
+def run_link_graph_scraper():
+    url = links_url_entry.get().strip().rstrip("/")
+    url = ensure_https(url)
+    folder = tab_state['links']['folder']
+    if not url or not folder:
+        messagebox.showerror("Error", "Enter URL and select export folder first.")
+        return
+    sitemap_url = links_sitemap_entry.get().strip()
+    if sitemap_url:
+        sitemap_url = ensure_https(sitemap_url)
+    export_format = 'graphml' if links_format_var.get() == 'GraphML' else 'csv'
+    stop_fn, update_stop_fn = make_stop_functions('links')
+    links_output_text.delete(1.0, tk.END)
+    tab_state['links']['thread'] = scrape_link_graph(url, folder, links_output_text, stop_fn, update_stop_fn,
+                                                     sitemap_url=sitemap_url, export_format=export_format)
 
 
 def quit_app():
-    root.quit()
-    root.destroy()
+    """Stops every crawl and closes the window once they have written their results.
+
+    The mainloop keeps running while waiting because the scraper threads still
+    write progress to the text widgets on their way out.
+    """
+    for state in tab_state.values():
+        state['control'].stop()
+    quit_button.config(state='disabled', text="Quitting...")
+    deadline = time.monotonic() + SHUTDOWN_DEADLINE
+
+    def close_when_drained():
+        running = [s['thread'] for s in tab_state.values() if s['thread'] is not None and s['thread'].is_alive()]
+        if running and time.monotonic() < deadline:
+            root.after(50, close_when_drained)
+            return
+        root.quit()
+        root.destroy()
+
+    close_when_drained()
 
 
 # GUI setup
@@ -116,8 +181,11 @@ meta_export_btn.grid(row=0, column=2, padx=10, pady=5)
 
 meta_start_btn = tk.Button(meta_tab, text="Start", command=run_meta_scraper)
 meta_start_btn.grid(row=1, column=2, padx=10, pady=5)
-meta_stop_btn = tk.Button(meta_tab, text="Stop", command=lambda: tab_state.__setitem__('meta', {**tab_state['meta'], 'stop': True}), bg='red', fg='white')
+meta_stop_btn = tk.Button(meta_tab, text="Stop", command=lambda: tab_state['meta']['control'].stop(), bg='red', fg='white')
 meta_stop_btn.grid(row=2, column=2, padx=10, pady=5)
+meta_pause_btn = tk.Button(meta_tab, text="Pause", command=lambda: toggle_pause('meta'))
+meta_pause_btn.grid(row=2, column=3, padx=10, pady=5)
+pause_buttons['meta'] = meta_pause_btn
 
 meta_output_text = scrolledtext.ScrolledText(meta_tab, wrap=tk.WORD, height=20, width=80)
 meta_output_text.grid(row=3, column=0, columnspan=3, padx=10, pady=5, sticky='nsew')
@@ -139,8 +207,11 @@ errors_export_btn.grid(row=0, column=2, padx=10, pady=5)
 
 errors_start_btn = tk.Button(errors_tab, text="Start", command=run_error_scraper)
 errors_start_btn.grid(row=1, column=2, padx=10, pady=5)
-errors_stop_btn = tk.Button(errors_tab, text="Stop", command=lambda: tab_state.__setitem__('errors', {**tab_state['errors'], 'stop': True}), bg='red', fg='white')
+errors_stop_btn = tk.Button(errors_tab, text="Stop", command=lambda: tab_state['errors']['control'].stop(), bg='red', fg='white')
 errors_stop_btn.grid(row=2, column=2, padx=10, pady=5)
+errors_pause_btn = tk.Button(errors_tab, text="Pause", command=lambda: toggle_pause('errors'))
+errors_pause_btn.grid(row=2, column=3, padx=10, pady=5)
+pause_buttons['errors'] = errors_pause_btn
 
 errors_output_text = scrolledtext.ScrolledText(errors_tab, wrap=tk.WORD, height=20, width=80)
 errors_output_text.grid(row=3, column=0, columnspan=3, padx=10, pady=5, sticky='nsew')
@@ -162,8 +233,11 @@ images_export_btn.grid(row=0, column=2, padx=10, pady=5)
 
 images_start_btn = tk.Button(images_tab, text="Start", command=run_image_scraper)
 images_start_btn.grid(row=1, column=2, padx=10, pady=5)
-images_stop_btn = tk.Button(images_tab, text="Stop", command=lambda: tab_state.__setitem__('images', {**tab_state['images'], 'stop': True}), bg='red', fg='white')
+images_stop_btn = tk.Button(images_tab, text="Stop", command=lambda: tab_state['images']['control'].stop(), bg='red', fg='white')
 images_stop_btn.grid(row=2, column=2, padx=10, pady=5)
+images_pause_btn = tk.Button(images_tab, text="Pause", command=lambda: toggle_pause('images'))
+images_pause_btn.grid(row=2, column=3, padx=10, pady=5)
+pause_buttons['images'] = images_pause_btn
 
 images_output_text = scrolledtext.ScrolledText(images_tab, wrap=tk.WORD, height=20, width=80)
 images_output_text.grid(row=3, column=0, columnspan=3, padx=10, pady=5, sticky='nsew')
@@ -185,16 +259,81 @@ security_export_btn.grid(row=0, column=2, padx=10, pady=5)
 
 security_start_btn = tk.Button(security_tab, text="Start", command=run_security_scraper)
 security_start_btn.grid(row=1, column=2, padx=10, pady=5)
-security_stop_btn = tk.Button(security_tab, text="Stop", command=lambda: tab_state.__setitem__('security', {**tab_state['security'], 'stop': True}), bg='red', fg='white')
+security_stop_btn = tk.Button(security_tab, text="Stop", command=lambda: tab_state['security']['control'].stop(), bg='red', fg='white')
 security_stop_btn.grid(row=2, column=2, padx=10, pady=5)
+security_pause_btn = tk.Button(security_tab, text="Pause", command=lambda: toggle_pause('security'))
+security_pause_btn.grid(row=2, column=3, padx=10, pady=5)
+pause_buttons['security'] = security_pause_btn
 
 security_output_text = scrolledtext.ScrolledText(security_tab, wrap=tk.WORD, height=20, width=80)
 security_output_text.grid(row=3, column=0, columnspan=3, padx=10, pady=5, sticky='nsew')
 security_tab.rowconfigure(3, weight=1)
 security_tab.columnconfigure(1, weight=1)
 
+# On-Page SEO tab
+onpage_tab = ttk.Frame(notebook)
+notebook.add(onpage_tab, text='On-Page SEO')
+
+tk.Label(onpage_tab, text="Enter Base URL:").grid(row=0, column=0, padx=10, pady=5, sticky='w')
+onpage_url_entry = tk.Entry(onpage_tab, width=50)
+onpage_url_entry.grid(row=0, column=1, padx=10, pady=5, sticky='w')
+
+onpage_export_label = tk.Label(onpage_tab, text="No export folder selected.")
+onpage_export_label.grid(row=1, column=0, columnspan=2, padx=10, pady=5, sticky='w')
+onpage_export_btn = tk.Button(onpage_tab, text="Export Folder", command=lambda: select_folder_for('onpage', onpage_export_label))
+onpage_export_btn.grid(row=0, column=2, padx=10, pady=5)
+
+onpage_start_btn = tk.Button(onpage_tab, text="Start", command=run_onpage_scraper)
+onpage_start_btn.grid(row=1, column=2, padx=10, pady=5)
+onpage_stop_btn = tk.Button(onpage_tab, text="Stop", command=lambda: tab_state['onpage']['control'].stop(), bg='red', fg='white')
+onpage_stop_btn.grid(row=2, column=2, padx=10, pady=5)
+onpage_pause_btn = tk.Button(onpage_tab, text="Pause", command=lambda: toggle_pause('onpage'))
+onpage_pause_btn.grid(row=2, column=3, padx=10, pady=5)
+pause_buttons['onpage'] = onpage_pause_btn
+
+onpage_output_text = scrolledtext.ScrolledText(onpage_tab, wrap=tk.WORD, height=20, width=80)
+onpage_output_text.grid(row=3, column=0, columnspan=3, padx=10, pady=5, sticky='nsew')
+onpage_tab.rowconfigure(3, weight=1)
+onpage_tab.columnconfigure(1, weight=1)
+
+# Link Graph tab
+links_tab = ttk.Frame(notebook)
+notebook.add(links_tab, text='Link Graph')
+
+tk.Label(links_tab, text="Enter Base URL:").grid(row=0, column=0, padx=10, pady=5, sticky='w')
+links_url_entry = tk.Entry(links_tab, width=50)
+links_url_entry.grid(row=0, column=1, padx=10, pady=5, sticky='w')
+
+links_export_label = tk.Label(links_tab, text="No export folder selected.")
+links_export_label.grid(row=1, column=0, columnspan=2, padx=10, pady=5, sticky='w')
+links_export_btn = tk.Button(links_tab, text="Export Folder", command=lambda: select_folder_for('links', links_export_label))
+links_export_btn.grid(row=0, column=2, padx=10, pady=5)
+
+links_start_btn = tk.Button(links_tab, text="Start", command=run_link_graph_scraper)
+links_start_btn.grid(row=1, column=2, padx=10, pady=5)
+links_stop_btn = tk.Button(links_tab, text="Stop", command=lambda: tab_state['links']['control'].stop(), bg='red', fg='white')
+links_stop_btn.grid(row=2, column=2, padx=10, pady=5)
+links_pause_btn = tk.Button(links_tab, text="Pause", command=lambda: toggle_pause('links'))
+links_pause_btn.grid(row=2, column=3, padx=10, pady=5)
+pause_buttons['links'] = links_pause_btn
+
+tk.Label(links_tab, text="Sitemap URL (optional):").grid(row=2, column=0, padx=10, pady=5, sticky='w')
+links_sitemap_entry = tk.Entry(links_tab, width=50)
+links_sitemap_entry.grid(row=2, column=1, padx=10, pady=5, sticky='w')
+
+tk.Label(links_tab, text="Export Format:").grid(row=3, column=0, padx=10, pady=5, sticky='w')
+links_format_var = tk.StringVar(value='CSV')
+links_format_menu = ttk.Combobox(links_tab, textvariable=links_format_var, values=['CSV', 'GraphML'], state='readonly', width=10)
+links_format_menu.grid(row=3, column=1, padx=10, pady=5, sticky='w')
+
+links_output_text = scrolledtext.ScrolledText(links_tab, wrap=tk.WORD, height=20, width=80)
+links_output_text.grid(row=4, column=0, columnspan=3, padx=10, pady=5, sticky='nsew')
+links_tab.rowconfigure(4, weight=1)
+links_tab.columnconfigure(1, weight=1)
+
 # Global quit button
 quit_button = tk.Button(root, text="Quit", command=quit_app, bg='red', fg='white')
 quit_button.pack(side='left', padx=10, pady=(0, 10))
+root.protocol("WM_DELETE_WINDOW", quit_app)
 
 root.mainloop()
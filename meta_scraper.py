@@ -1,6 +1,6 @@
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urldefrag
+from urllib.parse import urljoin
 import csv
 import os
 import random
@@ -8,13 +8,13 @@ import threading
 import tkinter as tk
 from tkinter import messagebox
 
+from fetcher import fetch, CrawlSession, is_analyzed, claim_final_url, write_redirect_report, normalize_url
+
 
 def scrape_meta_descriptions(base_url, output_folder, output_text, stop_scraping, update_stop_flag):
     """Scrapes website for missing meta descriptions and exports to CSV."""
 
     def scrape_process():
-        def normalize_url(u: str) -> str:
-            return urldefrag(u)[0]
         nonlocal stop_scraping
         random_number = random.randint(1000, 9999)
         filename = f'{base_url[8:]}-meta-descriptions-{random_number}.csv'
@@ -25,6 +25,8 @@ def scrape_meta_descriptions(base_url, output_folder, output_text, stop_scraping
             csv_writer.writerow(['Post Name', 'Post URL', 'Meta Description', 'Posts with Issues'])
 
             visited_urls = set()
+            # Cookies, connections and the alias -> final URL cache for this crawl
+            session = CrawlSession(base_url, control=stop_scraping)
             # Meta-specific counters
             total_pages = 0                  # pages crawled
             pages_missing_meta = 0           # pages where page-level og:description missing
@@ -40,12 +42,15 @@ def scrape_meta_descriptions(base_url, output_folder, output_text, stop_scraping
                     output_text.insert(tk.END, "Scraping stopped by user.\n")
                     return
                 url = normalize_url(url)
-                if url in visited_urls:
+                if is_analyzed(url, visited_urls, session):
                     return
                 visited_urls.add(url)
 
                 try:
-                    response = requests.get(url)
+                    response = fetch(url, session=session, control=stop_scraping)
+                    url = claim_final_url(response, url, visited_urls)
+                    if url is None:
+                        return
                     response.raise_for_status()
                 except requests.exceptions.RequestException as e:
                     output_text.insert(tk.END, f"Failed to fetch {url}: {e}\n")
@@ -93,9 +98,16 @@ def scrape_meta_descriptions(base_url, output_folder, output_text, stop_scraping
             csv_writer.writerow(['', '', 'Summary - Pages With Meta:', pages_with_meta])
             csv_writer.writerow(['', '', 'Summary - Total Article Rows:', total_article_rows])
             csv_writer.writerow(['', '', 'Summary - Article Rows Missing Meta:', article_rows_missing_meta])
+            csv_writer.writerow(['', '', 'Summary - Run Status:', 'Partial (stopped by user)' if stop_scraping() else 'Complete'])
+
+        write_redirect_report(session.redirects, output_folder, base_url, random_number, output_text)
 
-        output_text.insert(tk.END, f"\nScraping complete. Results saved to {filepath}\n")
-        messagebox.showinfo("Success", f"Scraping complete! Results saved to {filepath}")
+        if stop_scraping():
+            output_text.insert(tk.END, f"\nScraping stopped by user. Partial results saved to {filepath}\n")
+        else:
+            output_text.insert(tk.END, f"\nScraping complete. Results saved to {filepath}\n")
+            messagebox.showinfo("Success", f"Scraping complete! Results saved to {filepath}")
 
     thread = threading.Thread(target=scrape_process, daemon=True)
     thread.start()
+    return thread
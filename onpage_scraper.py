@@ -0,0 +1,239 @@
+import requests
+from bs4 import BeautifulSoup, NavigableString, Tag
+from urllib.parse import urljoin
+import csv
+import os
+import random
+import threading
+import tkinter as tk
+from tkinter import messagebox
+
+from fetcher import fetch, CrawlSession, is_analyzed, claim_final_url, write_redirect_report, normalize_url
+
+# Text inside these tags is not visible page copy and is left out of the word count
+NON_CONTENT_TAGS = {'script', 'style', 'noscript', 'template', 'title'}
+
+TITLE_MAX_LENGTH = 60
+META_DESCRIPTION_MAX_LENGTH = 160
+THIN_CONTENT_WORDS = 300
+
+
+def analyze_page(soup):
+    """Collects on-page SEO signals from a parsed page in a single pass over the tree.
+
+    Returns a (record, links) tuple. The record is a flat dict with one value per
+    exported column; links holds every <a href> found on the way so the crawler
+    does not need a second find_all() over the same DOM.
+    """
+    title = ''
+    meta_description = ''
+    og_description = ''
+    canonical = ''
+    robots = ''
+    hreflangs = []
+    h1_count = 0
+    word_count = 0
+    structured_data = set()
+    links = []
+
+    for node in soup.descendants:
+        if isinstance(node, Tag):
+            name = node.name
+            if name == 'a':
+                href = node.get('href')
+                if href:
+                    links.append(href)
+            elif name == 'h1':
+                h1_count += 1
+            elif name == 'meta':
+                meta_name = (node.get('name') or '').lower()
+                meta_property = (node.get('property') or '').lower()
+                content = (node.get('content') or '').strip()
+                if meta_name == 'description' and not meta_description:
+                    meta_description = content
+                elif meta_name == 'robots' and not robots:
+                    robots = content
+                elif meta_property == 'og:description' and not og_description:
+                    og_description = content
+            elif name == 'link':
+                rel = ' '.join(node.get('rel', [])).lower()
+                if 'canonical' in rel and not canonical:
+                    canonical = (node.get('href') or '').strip()
+                elif 'alternate' in rel and node.get('hreflang'):
+                    hreflangs.append(node['hreflang'].strip())
+            elif name == 'title' and not title:
+                # SVG icons carry their own <title>; only the document title counts
+                if node.find_parent('svg') is None:
+                    title = node.get_text(' ', strip=True)
+            elif name == 'script' and (node.get('type') or '').lower() == 'application/ld+json':
+                structured_data.add('JSON-LD')
+
+            if node.has_attr('itemscope') or node.has_attr('itemtype'):
+                structured_data.add('Microdata')
+            elif node.has_attr('typeof') or node.has_attr('vocab'):
+                structured_data.add('RDFa')
+        elif type(node) is NavigableString:
+            # Comments, CDATA and doctypes are NavigableString subclasses and are skipped above
+            if node.parent is not None and node.parent.name not in NON_CONTENT_TAGS:
+                word_count += len(node.split())
+
+    issues = []
+    if not title:
+        issues.append('Missing title')
+    elif len(title) > TITLE_MAX_LENGTH:
+        issues.append('Title too long')
+    if not meta_description and not og_description:
+        issues.append('Missing meta description')
+    elif len(meta_description or og_description) > META_DESCRIPTION_MAX_LENGTH:
+        issues.append('Meta description too long')
+    if not canonical:
+        issues.append('Missing canonical')
+    if 'noindex' in robots.lower():
+        issues.append('Noindex')
+    if h1_count == 0:
+        issues.append('Missing H1')
+    elif h1_count > 1:
+        issues.append('Multiple H1')
+    if word_count < THIN_CONTENT_WORDS:
+        issues.append('Thin content')
+
+    record = {
+        'title': title,
+        'title_length': len(title),
+        'meta_description': meta_description,
+        'og_description': og_description,
+        'canonical': canonical,
+        'robots': robots,
+        'hreflang': ', '.join(hreflangs),
+        'h1_count': h1_count,
+        'word_count': word_count,
+        'structured_data': ', '.join(sorted(structured_data)),
+        'issues': '; '.join(issues),
+    }
+    return record, links
+
+
+def scrape_onpage(base_url, output_folder, output_text, stop_scraping, update_stop_flag):
+    """Scrapes the website for on-page SEO signals and exports one row per page to CSV.
+
+    Columns exported per row:
+    - Page URL
+    - Title / Title Length
+    - Meta Description (name="description")
+    - OG Description (property="og:description")
+    - Canonical
+    - Robots (meta robots content)
+    - Hreflang (comma separated language codes)
+    - H1 Count
+    - Word Count (visible text only)
+    - Structured Data (JSON-LD, Microdata, RDFa)
+    - Issues (semicolon separated)
+    - Row Issue (1/0)
+    """
+
+    def scrape_process():
+        random_number = random.randint(1000, 9999)
+        filename = f"{base_url[8:]}-onpage-{random_number}.csv"
+        filepath = os.path.join(output_folder, filename)
+
+        with open(filepath, 'w', newline='', encoding='utf-8') as csv_file:
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerow([
+                'Page URL', 'Title', 'Title Length', 'Meta Description', 'OG Description', 'Canonical',
+                'Robots', 'Hreflang', 'H1 Count', 'Word Count', 'Structured Data', 'Issues', 'Row Issue'
+            ])
+
+            visited_urls = set()
+            # Cookies, connections and the alias -> final URL cache for this crawl
+            session = CrawlSession(base_url, control=stop_scraping)
+            total_issues_counter = 0
+            # On-page counters
+            total_pages = 0
+            pages_missing_title = 0
+            pages_missing_meta = 0
+            pages_missing_h1 = 0
+            pages_with_structured_data = 0
+
+            def scrape_page(url):
+                nonlocal total_issues_counter, total_pages, pages_missing_title, pages_missing_meta
+                nonlocal pages_missing_h1, pages_with_structured_data
+
+                if stop_scraping():
+                    return
+                url = normalize_url(url)
+                if is_analyzed(url, visited_urls, session):
+                    return
+                visited_urls.add(url)
+
+                try:
+                    response = fetch(url, session=session, control=stop_scraping)
+                    url = claim_final_url(response, url, visited_urls)
+                    if url is None:
+                        return
+                    response.raise_for_status()
+                except requests.exceptions.RequestException as e:
+                    output_text.insert(tk.END, f"Failed to fetch {url}: {e}\n")
+                    output_text.see('end')
+                    return
+
+                # PDFs, images and feeds linked from pages are not pages to audit
+                if 'html' not in response.headers.get('Content-Type', '').lower():
+                    return
+
+                soup = BeautifulSoup(response.text, 'html.parser')
+                output_text.insert(tk.END, f"Scraping URL: {url}\n")
+                output_text.see('end')
+
+                record, links = analyze_page(soup)
+
+                total_pages += 1
+                if not record['title']:
+                    pages_missing_title += 1
+                if not record['meta_description'] and not record['og_description']:
+                    pages_missing_meta += 1
+                if record['h1_count'] == 0:
+                    pages_missing_h1 += 1
+                if record['structured_data']:
+                    pages_with_structured_data += 1
+
+                row_issue = 1 if record['issues'] else 0
+                if row_issue:
+                    total_issues_counter += 1
+
+                csv_writer.writerow([
+                    url, record['title'], record['title_length'], record['meta_description'],
+                    record['og_description'], record['canonical'], record['robots'], record['hreflang'],
+                    record['h1_count'], record['word_count'], record['structured_data'], record['issues'],
+                    row_issue
+                ])
+
+                # Follow in-domain links collected during analysis
+                base_root = normalize_url(base_url)
+                for href in links:
+                    if stop_scraping():
+                        return
+                    full_url = normalize_url(urljoin(url, href))
+                    if base_root in full_url:
+                        scrape_page(full_url)
+
+            scrape_page(normalize_url(base_url))
+            # Summary rows (do not change columns)
+            csv_writer.writerow(['', '', '', '', '', '', '', '', '', '', '', 'Total Pages with Issues:', total_issues_counter])
+            csv_writer.writerow(['', '', '', '', '', '', '', '', '', '', '', 'Summary - Total Pages Crawled:', total_pages])
+            csv_writer.writerow(['', '', '', '', '', '', '', '', '', '', '', 'Summary - Pages Missing Title:', pages_missing_title])
+            csv_writer.writerow(['', '', '', '', '', '', '', '', '', '', '', 'Summary - Pages Missing Meta:', pages_missing_meta])
+            csv_writer.writerow(['', '', '', '', '', '', '', '', '', '', '', 'Summary - Pages Missing H1:', pages_missing_h1])
+            csv_writer.writerow(['', '', '', '', '', '', '', '', '', '', '', 'Summary - Pages With Structured Data:', pages_with_structured_data])
+            csv_writer.writerow(['', '', '', '', '', '', '', '', '', '', '', 'Summary - Run Status:', 'Partial (stopped by user)' if stop_scraping() else 'Complete'])
+
+        write_redirect_report(session.redirects, output_folder, base_url, random_number, output_text)
+
+        if stop_scraping():
+            output_text.insert(tk.END, "\nScraping stopped by user.\n")
+        else:
+            output_text.insert(tk.END, f"\nOn-page scan complete. Results saved to {filepath}\n")
+            messagebox.showinfo("Success", f"On-page scan complete! Results saved to {filepath}")
+
+    thread = threading.Thread(target=scrape_process, daemon=True)
+    thread.start()
+    return thread
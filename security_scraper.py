@@ -1,6 +1,6 @@
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urldefrag, urlparse
+from urllib.parse import urljoin, urlparse
 import csv
 import os
 import random
@@ -8,6 +8,8 @@ import threading
 import tkinter as tk
 from tkinter import messagebox
 
+from fetcher import fetch, CrawlSession, is_analyzed, claim_final_url, write_redirect_report, normalize_url
+
 
 def scrape_security(base_url, output_folder, output_text, stop_scraping, update_stop_flag):
     """Scrapes the website to verify HTTPS usage, detect mixed content, and report security headers.
@@ -28,9 +30,6 @@ def scrape_security(base_url, output_folder, output_text, stop_scraping, update_
     """
 
     def scrape_process():
-        def normalize_url(u: str) -> str:
-            return urldefrag(u)[0]
-
         def is_same_site(url_a: str, url_b: str) -> bool:
             try:
                 a = urlparse(url_a)
@@ -51,6 +50,8 @@ def scrape_security(base_url, output_folder, output_text, stop_scraping, update_
             ])
 
             visited_urls = set()
+            # Cookies, connections and the alias -> final URL cache for this crawl
+            session = CrawlSession(base_url, control=stop_scraping)
             total_issues_counter = 0
             # Page scheme counters
             total_pages = 0
@@ -108,12 +109,15 @@ def scrape_security(base_url, output_folder, output_text, stop_scraping, update_
                 if stop_scraping():
                     return
                 url = normalize_url(url)
-                if url in visited_urls:
+                if is_analyzed(url, visited_urls, session):
                     return
                 visited_urls.add(url)
 
                 try:
-                    response = requests.get(url)
+                    response = fetch(url, session=session, control=stop_scraping)
+                    url = claim_final_url(response, url, visited_urls)
+                    if url is None:
+                        return
                     response.raise_for_status()
                 except requests.exceptions.RequestException as e:
                     output_text.insert(tk.END, f"Failed to fetch {url}: {e}\n")
@@ -171,6 +175,9 @@ def scrape_security(base_url, output_folder, output_text, stop_scraping, update_
             csv_writer.writerow(['', '', '', '', '', '', '', '', '', '', 'Summary - HTTPS Pages:', https_pages])
             csv_writer.writerow(['', '', '', '', '', '', '', '', '', '', 'Summary - HTTP Pages:', http_pages])
             csv_writer.writerow(['', '', '', '', '', '', '', '', '', '', 'Summary - Other Pages:', other_pages])
+            csv_writer.writerow(['', '', '', '', '', '', '', '', '', '', 'Summary - Run Status:', 'Partial (stopped by user)' if stop_scraping() else 'Complete'])
+
+        write_redirect_report(session.redirects, output_folder, base_url, random_number, output_text)
 
         if stop_scraping():
             output_text.insert(tk.END, "\nScraping stopped by user.\n")
@@ -180,3 +187,4 @@ def scrape_security(base_url, output_folder, output_text, stop_scraping, update_
 
     thread = threading.Thread(target=scrape_process, daemon=True)
     thread.start()
+    return thread
@@ -0,0 +1,145 @@
+import threading
+import time
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+import fetcher
+from fetcher import AdaptiveThrottle, CrawlSession, fetch
+
+HOST = 'example.com'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeCondition(threading.Condition):
+    """Lets acquire() wait out the host delay on the fake clock instead of the real one."""
+
+    def __init__(self, clock):
+        super().__init__()
+        self.clock = clock
+
+    def wait(self, timeout=None):
+        self.clock.sleep(timeout or 0.0)
+        return False
+
+
+class FakeResponse:
+    def __init__(self, url, status_code, ttfb, headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.elapsed = timedelta(seconds=ttfb)
+        self.headers = headers or {}
+        self.history = []
+
+
+class FakeSession(CrawlSession):
+    """Serves canned (status, ttfb, headers) per path and advances the fake clock by the TTFB."""
+
+    def __init__(self, clock, routes):
+        super().__init__()
+        self.clock = clock
+        self.routes = routes
+
+    def request(self, method, url, **kwargs):
+        status, ttfb, headers = self.routes[url.split(HOST, 1)[1]]
+        self.clock.sleep(ttfb)
+        return FakeResponse(url, status, ttfb, headers)
+
+
+class AdaptiveThrottleTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(fetcher, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.throttle = AdaptiveThrottle()
+        self.throttle._condition = FakeCondition(self.clock)
+
+    def request(self, ttfb, error=False, retry_after=None):
+        started = self.throttle.acquire(HOST)
+        self.clock.sleep(ttfb or 0.0)
+        self.throttle.release(HOST, started, ttfb, error, retry_after)
+
+    def test_fast_redirect_before_slow_page_does_not_back_off(self):
+        session = FakeSession(self.clock, {
+            '/old': (301, 0.005, {'Location': f'https://{HOST}/page'}),
+            '/page': (200, 0.4, {}),
+        })
+        for _ in range(200):
+            # Fetch the alias every time so each page load includes the cheap 301 hop
+            fetch(f'https://{HOST}/old', session=session, throttle=self.throttle, track_redirects=False)
+
+        stats = self.throttle.stats(HOST)
+        self.assertEqual(stats['concurrency'], self.throttle.max_concurrency)
+        self.assertEqual(stats['delay'], 0.0)
+        self.assertAlmostEqual(stats['ttfb_baseline'], 0.4)
+
+    def test_mix_of_fast_and_slow_pages_does_not_back_off(self):
+        for i in range(200):
+            self.request(0.02 if i % 4 == 0 else 0.4)
+
+        stats = self.throttle.stats(HOST)
+        self.assertEqual(stats['concurrency'], self.throttle.max_concurrency)
+        self.assertEqual(stats['delay'], 0.0)
+
+    def test_sustained_slowdown_backs_off(self):
+        for _ in range(60):
+            self.request(0.1)
+        for _ in range(10):
+            self.request(1.5)
+
+        stats = self.throttle.stats(HOST)
+        self.assertLess(stats['concurrency'], self.throttle.max_concurrency)
+        self.assertGreater(stats['delay'], 0.0)
+
+    def test_single_error_does_not_back_off_but_a_run_does(self):
+        for _ in range(30):
+            self.request(0.1)
+        self.request(None, error=True)
+        self.assertEqual(self.throttle.stats(HOST)['concurrency'], self.throttle.max_concurrency)
+
+        for _ in range(3):
+            self.request(None, error=True)
+        self.assertLess(self.throttle.stats(HOST)['concurrency'], self.throttle.max_concurrency)
+
+    def test_retry_after_backs_off_immediately(self):
+        for _ in range(30):
+            self.request(0.1)
+        self.request(None, error=True, retry_after=0.0)
+        self.assertLess(self.throttle.stats(HOST)['concurrency'], self.throttle.max_concurrency)
+
+
+class ResetTest(unittest.TestCase):
+    def test_reset_keeps_state_of_waiting_request(self):
+        throttle = AdaptiveThrottle(initial_delay=1.0)
+        started = throttle.acquire(HOST)
+        throttle.release(HOST, started, 0.1)
+        state = throttle._hosts[HOST]
+
+        # The next request has to wait for the delay; reset while it does
+        waiter = threading.Thread(target=lambda: throttle.release(HOST, throttle.acquire(HOST), 0.1))
+        waiter.start()
+        while state.waiting == 0 and waiter.is_alive():
+            time.sleep(0.01)
+        throttle.reset(HOST)
+        waiter.join(5)
+
+        self.assertIs(throttle._hosts[HOST], state)
+        self.assertEqual(state.in_flight, 0)
+
+        throttle.reset(HOST)
+        self.assertNotIn(HOST, throttle._hosts)
+
+
+if __name__ == '__main__':
+    unittest.main()